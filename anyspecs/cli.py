@@ -7,6 +7,8 @@ import sys
 import pathlib
 import datetime
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional
 
 from .utils.logging import setup_logging
@@ -18,7 +20,37 @@ from .exporters.augment import AugmentExtractor
 from .exporters.codex import CodexExtractor
 from .core.formatters import JSONFormatter, MarkdownFormatter, HTMLFormatter
 from . import __version__
-from .utils.uploader import AnySpecsUploadClient
+
+# Batch exports with at least this many chats are formatted in worker processes
+PARALLEL_EXPORT_MIN = 4
+
+# Write buffer for export files
+EXPORT_WRITE_BUFFER = 1 << 20
+
+# Process umask, read once (os.umask can only be queried by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _write_export_file(formatter, chat: Dict[str, Any], output_path: pathlib.Path) -> None:
+    """Format one chat into output_path; module-level so worker processes can run it."""
+    # Stream into a private sibling file and rename it into place only once
+    # formatting succeeds, so a failure never leaves a truncated export behind
+    fd, part_path = tempfile.mkstemp(dir=str(output_path.parent), prefix=f".{output_path.name}.", suffix=".part")
+    try:
+        # mkstemp creates the file 0600; give exports their usual permissions
+        os.chmod(part_path, 0o666 & ~_UMASK)
+        # newline='' writes '\n' as-is, skipping the per-line CRLF translation pass on
+        # Windows; the 1 MiB buffer batches streamed chunks into few write syscalls
+        with open(fd, 'w', encoding='utf-8', newline='', buffering=EXPORT_WRITE_BUFFER) as f:
+            formatter.write(chat, f)
+        os.replace(part_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(part_path)
+        except OSError:
+            pass
+        raise
 
 
 class AnySpecsCLI:
@@ -312,8 +344,9 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         # Project filtering logic
         if args.project:
             # User explicitly specified a project
+            needle = args.project.lower()
             filtered_chats = [c for c in filtered_chats 
-                             if args.project.lower() in c.get('project', {}).get('name', '').lower()]
+                             if needle in c.get('project', {}).get('name', '').lower()]
             if not filtered_chats:
                 print(f"❌ No chat records found with project name containing '{args.project}'")
                 return []
@@ -321,8 +354,9 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         elif not args.all_projects:
             # Default to only exporting sessions for the current project
             current_project = get_project_name()
+            needle = current_project.lower()
             filtered_chats = [c for c in filtered_chats 
-                             if current_project.lower() in c.get('project', {}).get('name', '').lower()]
+                             if needle in c.get('project', {}).get('name', '').lower()]
             if not filtered_chats:
                 print(f"❌ No chat records found for current project '{current_project}'")
                 print(f"💡 Use --all-projects to export all projects' sessions, or use --project to specify another project")
@@ -363,9 +397,7 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
             output_path = output_path.with_suffix(formatter.get_file_extension())
         
         try:
-            content = formatter.format(chat)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            _write_export_file(formatter, chat, output_path)
             
             print(f"✅ Export successful: {output_path}")
             print(f"📄 File size: {output_path.stat().st_size} bytes")
@@ -377,6 +409,15 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
     
     def _export_multiple_chats(self, chats: List[Dict[str, Any]], formatter, args) -> int:
         """Export multiple chats."""
+        # Sessions without messages would only produce empty documents
+        non_empty = [c for c in chats if c.get('messages')]
+        if len(non_empty) < len(chats):
+            print(f"⏭️  Skipping {len(chats) - len(non_empty)} empty chat sessions")
+            chats = non_empty
+        if not chats:
+            print("❌ No chat records with messages to export")
+            return 1
+        
         if args.output:
             output_base = args.output
         else:
@@ -387,7 +428,8 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         
         print(f"📁 Output directory: {output_base}")
         
-        success_count = 0
+        jobs = []
+        used_paths = set()
         for i, chat in enumerate(chats, 1):
             # Generate filename
             session_id = chat.get('session_id', '')[:8] or f'chat{i:03d}'
@@ -406,28 +448,64 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
                 timestamp = f"-{i:03d}"
             
             filename = f"{source}-chat-{project_name}-{session_id}{timestamp}"
-            output_path = output_base / filename
+            output_path = self._batch_output_path(output_base, filename, formatter)
             
-            # Add extension if needed
-            if not output_path.suffix:
-                output_path = output_path.with_suffix(formatter.get_file_extension())
+            # Truncated session ids and second-resolution timestamps can collide;
+            # jobs may run concurrently, so every one needs its own file
+            if output_path in used_paths:
+                output_path = self._batch_output_path(output_base, f"{filename}-{i:03d}", formatter)
+            used_paths.add(output_path)
             
-            try:
-                content = formatter.format(chat)
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                print(f"✅ {i}/{len(chats)}: {output_path.name}")
+            jobs.append((chat, output_path))
+        
+        success_count = 0
+        for done, (output_path, error) in enumerate(self._run_export_jobs(jobs, formatter), 1):
+            if error is None:
+                print(f"✅ {done}/{len(chats)}: {output_path.name}")
                 success_count += 1
-            except Exception as e:
-                print(f"❌ {i}/{len(chats)}: Export failed - {e}")
+            else:
+                print(f"❌ {done}/{len(chats)}: Export failed - {error}")
         
         print(f"\n🎉 Batch export completed! {success_count}/{len(chats)} files exported to: {output_base}")
         
         return 0 if success_count > 0 else 1
     
 
+    @staticmethod
+    def _batch_output_path(output_base: pathlib.Path, filename: str, formatter) -> pathlib.Path:
+        """Build a batch export path, adding the format's extension if needed."""
+        output_path = output_base / filename
+        if not output_path.suffix:
+            output_path = output_path.with_suffix(formatter.get_file_extension())
+        return output_path
+
+    def _run_export_jobs(self, jobs, formatter):
+        """Write (chat, output_path) jobs, yielding (output_path, error) as each finishes.
+        
+        Formatting is CPU-bound, so larger batches are spread over worker processes.
+        """
+        if len(jobs) < PARALLEL_EXPORT_MIN:
+            for chat, output_path in jobs:
+                try:
+                    _write_export_file(formatter, chat, output_path)
+                    yield output_path, None
+                except Exception as e:
+                    yield output_path, e
+            return
+        
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            futures = {
+                pool.submit(_write_export_file, formatter, chat, output_path): output_path
+                for chat, output_path in jobs
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.exception()
+
     def _upload_command(self, args) -> int:
         """Execute the upload command (token read from ANYSPECS_TOKEN)."""
+        # Imported here so commands that never upload skip loading requests
+        from .utils.uploader import AnySpecsUploadClient
+        
         token = os.environ.get('ANYSPECS_TOKEN')
         client = AnySpecsUploadClient(args.url, token, args.http)
 
@@ -463,11 +541,13 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         # Import required modules
         try:
             from .core.ai_processor import AIProcessor
-            from .config.ai_config import ai_config
+            from .config.ai_config import get_ai_config
         except ImportError:
             print("❌ Required modules not found. Please ensure all dependencies are installed.")
             return 1
         
+        ai_config = get_ai_config()
+        
         # Validate input directory
         input_dir = args.input
         if not input_dir.exists():
@@ -479,12 +559,15 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         if not output_dir.exists():
             output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Load the saved configuration once and reuse it for every lookup below
+        config = ai_config.load_config_readonly()
+        
         # Determine provider to use
         provider = args.provider
         
         # If no provider specified via args, try to get from config
         if not provider:
-            provider = ai_config.get_default_provider()
+            provider = ai_config.get_default_provider(config=config)
             if not provider:
                 print("❌ No AI provider specified and no default provider configured.")
                 print("💡 Let's set up your first AI provider...")
@@ -492,7 +575,7 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
                 provider = 'aihubmix'
         
         # Check if provider is configured, if not run interactive setup
-        if not ai_config.is_configured(provider):
+        if not ai_config.is_configured(provider, config=config):
             print(f"🔧 {provider.upper()} is not configured yet.")
             print("Let's set it up...")
             
@@ -502,9 +585,10 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
                 return 1
             
             print()  # Add spacing after setup
+            config = ai_config.load_config_readonly()
         
         # Get provider configuration (already includes .env file priority)
-        provider_config = ai_config.get_provider_config(provider)
+        provider_config = ai_config.get_provider_config(provider, config=config)
         
         # Override with command line arguments if provided (highest priority)
         api_key = args.api_key or provider_config.get('api_key')
@@ -583,11 +667,13 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         """Execute the setup command."""
         
         try:
-            from .config.ai_config import ai_config
+            from .config.ai_config import get_ai_config
         except ImportError:
             print("❌ AI config module not found. Please ensure all dependencies are installed.")
             return 1
         
+        ai_config = get_ai_config()
+        
         # Handle list option
         if args.list:
             return self._list_ai_providers()
@@ -614,11 +700,13 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         """List all configured AI providers."""
         
         try:
-            from .config.ai_config import ai_config
+            from .config.ai_config import get_ai_config
         except ImportError:
             print("❌ AI config module not found.")
             return 1
         
+        ai_config = get_ai_config()
+        
         configured_providers = ai_config.list_configured_providers()
         
         if not configured_providers:
@@ -641,11 +729,13 @@ Note: After first-time setup, API keys and models are auto-saved to .env file an
         """Reset AI configuration."""
         
         try:
-            from .config.ai_config import ai_config
+            from .config.ai_config import get_ai_config
         except ImportError:
             print("❌ AI config module not found.")
             return 1
         
+        ai_config = get_ai_config()
+        
         try:
             confirm = input("⚠️  This will reset all AI configurations. Continue? (y/N): ").strip().lower()
             if confirm not in ('y', 'yes'):
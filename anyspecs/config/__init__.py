@@ -2,9 +2,24 @@
 Configuration package for AnySpecs CLI.
 """
 
-from .ai_config import AIConfigManager, ai_config
+from typing import Any
+
+from .ai_config import AIConfigManager, get_ai_config
+
+# Importing the submodule bound `ai_config` to it; drop that binding so the
+# package attribute resolves to the shared manager, as it always has
+del ai_config
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from anyspecs.config import ai_config` working without an import-time instance
+    if name == 'ai_config':
+        return get_ai_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'AIConfigManager',
-    'ai_config'
-]
\ No newline at end of file
+    'ai_config',
+    'get_ai_config'
+]
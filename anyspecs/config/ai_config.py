@@ -4,16 +4,93 @@ Handles saving and loading AI provider settings.
 """
 
 import os
-import json
+import copy
+import functools
 import sys
 import getpass
+import io
+import stat
+import tempfile
+from collections import ChainMap
 from pathlib import Path
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Literal, Mapping, Optional, Tuple
 
+from ..utils import json_utils
 from ..utils.logging import get_logger
 
 logger = get_logger('ai_config')
 
+# Comment line marking the AnySpecs block in .env files
+ENV_HEADER = '# AnySpecs AI Configuration'
+
+
+@functools.lru_cache(maxsize=1)
+def _default_config_dir() -> Path:
+    """Resolve the AnySpecs config directory once per process."""
+    return Path.home() / '.anyspecs'
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively wrap dicts in read-only mapping proxies."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Recursively copy a (possibly frozen) mapping into plain dicts."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+# Default configuration structure
+_DEFAULT_CONFIG = _freeze({
+    'default_provider': None,
+    'providers': {
+        'aihubmix': {
+            'api_key': None,
+            'model': 'gpt-4o-mini',
+            'base_url': 'https://aihubmix.com/v1',
+            'temperature': 0.3,
+            'max_tokens': 10000
+        },
+        'kimi': {
+            'api_key': None,
+            'model': 'kimi-k2-0711-preview',
+            'base_url': 'https://api.moonshot.cn/v1',
+            'temperature': 0.6,
+            'max_tokens': 10000
+        },
+        'minimax': {
+            'api_key': None,
+            'group_id': None,
+            'model': 'MiniMax-Text-01',
+            'base_url': 'https://api.minimaxi.com/v1',
+            'temperature': 0.3,
+            'max_tokens': 8192
+        },
+        'ppio': {
+            'api_key': None,
+            'model': 'deepseek/deepseek-r1',
+            'base_url': 'https://api.ppinfra.com/v3/openai',
+            'temperature': 0.3,
+            'max_tokens': 512
+        },
+        'dify': {
+            'api_key': None,
+            'base_url': 'https://api.dify.ai/v1'
+        }
+    },
+    'compress_settings': {
+        'default_input_dir': '.anyspecs',
+        'default_output_dir': None,  # None means same as input
+        'default_pattern': None,
+        'batch_size': 1
+    }
+})
+
 
 def masked_input(prompt: str) -> str:
     """Input function that shows asterisks for each character typed."""
@@ -61,88 +138,110 @@ def masked_input(prompt: str) -> str:
 class AIConfigManager:
     """Manages AI provider configurations."""
     
+    # .env variable name -> (config key, value coercer)
+    _ENV_MAP = {
+        'ANYSPECS_AI_PROVIDER': ('provider', str),
+        'ANYSPECS_AI_API_KEY': ('api_key', str),
+        'ANYSPECS_AI_MODEL': ('model', str),
+        'ANYSPECS_AI_GROUP_ID': ('group_id', str),
+        'ANYSPECS_AI_TEMPERATURE': ('temperature', float),
+        'ANYSPECS_AI_MAX_TOKENS': ('max_tokens', int),
+    }
+    
     def __init__(self):
-        self.config_dir = Path.home() / '.anyspecs'
+        self.config_dir = _default_config_dir()
         self.config_file = self.config_dir / 'ai_config.json'
         self.env_file = Path.cwd() / '.env'
         self.logger = logger
         
-        # Ensure config directory exists
-        self.config_dir.mkdir(exist_ok=True)
-        
-        # Default configuration structure
-        self.default_config = {
-            'default_provider': None,
-            'providers': {
-                'aihubmix': {
-                    'api_key': None,
-                    'model': 'gpt-4o-mini',
-                    'base_url': 'https://aihubmix.com/v1',
-                    'temperature': 0.3,
-                    'max_tokens': 10000
-                },
-                'kimi': {
-                    'api_key': None,
-                    'model': 'kimi-k2-0711-preview',
-                    'base_url': 'https://api.moonshot.cn/v1',
-                    'temperature': 0.6,
-                    'max_tokens': 10000
-                },
-                'minimax': {
-                    'api_key': None,
-                    'group_id': None,
-                    'model': 'MiniMax-Text-01',
-                    'base_url': 'https://api.minimaxi.com/v1',
-                    'temperature': 0.3,
-                    'max_tokens': 8192
-                },
-                'ppio': {
-                    'api_key': None,
-                    'model': 'deepseek/deepseek-r1',
-                    'base_url': 'https://api.ppinfra.com/v3/openai',
-                    'temperature': 0.3,
-                    'max_tokens': 512
-                },
-                'dify': {
-                    'api_key': None,
-                    'base_url': 'https://api.dify.ai/v1'
-                }
-            },
-            'compress_settings': {
-                'default_input_dir': '.anyspecs',
-                'default_output_dir': None,  # None means same as input
-                'default_pattern': None,
-                'batch_size': 1
-            }
-        }
+        # Parsed file contents keyed on (mtime_ns, size) so repeated loads
+        # within one invocation skip the disk read and JSON decode
+        self._cached_config: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
+        self._cached_env: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
+        self._cached_view: Optional[Tuple[Dict[str, Any], Mapping[str, Any]]] = None
+        
+        # Whether the config file exists, remembered so a missing file is
+        # only stat'ed once per process
+        self._file_state: Literal['unknown', 'missing', 'present'] = 'unknown'
+        
+        # Config directory is created lazily on first write
+        self._dir_ensured = False
+        
+        # Read-only defaults shared by every manager instance
+        self.default_config = _DEFAULT_CONFIG
     
     def load_config(self) -> Dict[str, Any]:
         """Load AI configuration from file."""
         
-        if not self.config_file.exists():
-            self.logger.debug("AI config file not found, returning default config")
-            return self.default_config.copy()
+        config = self._load_raw_config()
+        if config is None:
+            return _thaw(_DEFAULT_CONFIG)
+        
+        # Merge with defaults to ensure all keys exist
+        return self._merge_with_defaults(copy.deepcopy(config))
+    
+    def load_config_readonly(self) -> Mapping[str, Any]:
+        """Return a read-only view of the configuration merged with defaults.
+        
+        The view is built once per change of the config file and shared
+        between calls, so read-only callers avoid the copy made by load_config.
+        """
+        
+        config = self._load_raw_config()
+        if config is None:
+            return _DEFAULT_CONFIG
+        
+        if self._cached_view is None or self._cached_view[0] is not config:
+            merged = self._merge_with_defaults(copy.deepcopy(config))
+            self._cached_view = (config, _freeze(merged))
+        return self._cached_view[1]
+    
+    def _load_raw_config(self) -> Optional[Dict[str, Any]]:
+        """Return the parsed config file without merging defaults.
+        
+        The parsed dict is cached until the file changes on disk and is shared
+        with the cache, so callers must not mutate it. Returns None when the
+        file is missing or unreadable.
+        """
+        
+        if self._file_state == 'missing':
+            return None
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            try:
+                stat_key = self._stat_key(self.config_file)
+            except FileNotFoundError:
+                self._file_state = 'missing'
+                self.logger.debug("AI config file not found, returning default config")
+                return None
+            self._file_state = 'present'
+            
+            if self._cached_config is not None and self._cached_config[0] == stat_key:
+                return self._cached_config[1]
             
-            # Merge with defaults to ensure all keys exist
-            merged_config = self._merge_with_defaults(config)
+            config = json_utils.loads(self.config_file.read_bytes())
+            
+            self._cached_config = (stat_key, config)
             self.logger.debug("AI config loaded successfully")
-            return merged_config
+            return config
             
         except Exception as e:
             self.logger.error(f"Error loading AI config: {e}")
-            return self.default_config.copy()
+            return None
     
     def save_config(self, config: Dict[str, Any]) -> bool:
         """Save AI configuration to file."""
         
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
+            if not self._dir_ensured:
+                self.config_dir.mkdir(parents=True, exist_ok=True)
+                self._dir_ensured = True
+            # Serialize once and swap the file in atomically so a crash
+            # mid-write never leaves a truncated config behind
+            self._atomic_write(self.config_file, json_utils.dumps_pretty(config))
             
+            self._cached_config = (self._stat_key(self.config_file), copy.deepcopy(config))
+            self._file_state = 'present'
             self.logger.info(f"AI config saved to: {self.config_file}")
             return True
             
@@ -150,10 +249,49 @@ class AIConfigManager:
             self.logger.error(f"Error saving AI config: {e}")
             return False
     
-    def is_configured(self, provider: Optional[str] = None) -> bool:
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        """Write data to path via a temporary file and an atomic rename.
+        
+        Symlinks are followed so the link survives and its target is updated,
+        and an existing file keeps its permission bits.
+        """
+        
+        path = path.resolve()
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = None
+        
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f'.{path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            if mode is not None:
+                os.chmod(tmp_path, mode)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    @staticmethod
+    def _stat_key(path: Path) -> Tuple[int, int]:
+        """Return a cache validity key for a file based on mtime and size."""
+        
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    
+    def is_configured(self, provider: Optional[str] = None, *,
+                      config: Optional[Mapping[str, Any]] = None) -> bool:
         """Check if AI configuration is complete."""
         
-        config = self.load_config()
+        if config is None:
+            # Defaults never carry an API key, group ID or default provider,
+            # so the unmerged file contents give the same answer
+            config = self._load_raw_config() or {}
         
         # If no provider specified, check if any provider is configured
         if provider is None:
@@ -177,38 +315,49 @@ class AIConfigManager:
         
         return has_api_key
     
-    def get_provider_config(self, provider: str) -> Dict[str, Any]:
+    def get_provider_config(self, provider: str, *,
+                            config: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
         """Get configuration for a specific provider."""
         
-        config = self.load_config()
-        provider_config = config.get('providers', {}).get(provider, {})
-        
-        # Merge with environment variables (priority: command line > .env file > config file)
-        merged_config = provider_config.copy()
+        if config is None:
+            # Only materialize this provider's settings over its defaults
+            # rather than merging the whole configuration tree
+            raw = self._load_raw_config() or {}
+            file_layer = ChainMap(raw.get('providers', {}).get(provider, {}),
+                                  self.default_config['providers'].get(provider, {}))
+        else:
+            file_layer = config.get('providers', {}).get(provider, {})
         
-        # Load from .env file first
+        # Priority: environment variable API key > .env file > config file
         env_config = self._load_from_env()
-        
-        # Apply .env values if config doesn't have them
-        if env_config.get('api_key') and not merged_config.get('api_key'):
-            merged_config['api_key'] = env_config['api_key']
-        if env_config.get('model') and not merged_config.get('model'):
-            merged_config['model'] = env_config['model']
-        if env_config.get('provider') and env_config['provider'] == provider:
+        if env_config.get('provider') == provider:
             # If .env specifies this provider, use its settings
-            merged_config.update({k: v for k, v in env_config.items() if v and k != 'provider'})
+            dotenv_layer = {k: v for k, v in env_config.items() if v and k != 'provider'}
+        else:
+            # Otherwise .env only fills in a missing API key or model
+            dotenv_layer = {k: env_config[k] for k in ('api_key', 'model')
+                            if env_config.get(k) and not file_layer.get(k)}
         
-        # Check for environment variable API key (highest priority)
         env_key = os.getenv('ANYSPECS_AI_API_KEY')
-        if env_key:
-            merged_config['api_key'] = env_key
+        env_var_layer = {'api_key': env_key} if env_key else {}
         
-        return merged_config
+        return dict(ChainMap(env_var_layer, dotenv_layer, file_layer))
+    
+    def get_provider_field(self, provider: str, field: str, default: Any = None) -> Any:
+        """Get one stored setting for a provider, falling back to its default.
+        
+        Unlike get_provider_config this ignores .env and environment overrides.
+        """
+        
+        config = self.load_config_readonly()
+        return config.get('providers', {}).get(provider, {}).get(field, default)
     
     def set_provider_config(self, provider: str, **settings) -> bool:
         """Set configuration for a specific provider."""
         
-        config = self.load_config()
+        # Patch the file contents as stored rather than baking every
+        # default into the user's config file
+        config = copy.deepcopy(self._load_raw_config() or {})
         
         if 'providers' not in config:
             config['providers'] = {}
@@ -229,7 +378,7 @@ class AIConfigManager:
         
         return config_success and env_success
     
-    def get_default_provider(self) -> Optional[str]:
+    def get_default_provider(self, *, config: Optional[Mapping[str, Any]] = None) -> Optional[str]:
         """Get the default AI provider."""
         
         # Priority: .env file > config file
@@ -237,13 +386,14 @@ class AIConfigManager:
         if env_config.get('provider'):
             return env_config['provider']
         
-        config = self.load_config()
+        if config is None:
+            config = self.load_config_readonly()
         return config.get('default_provider')
     
     def set_default_provider(self, provider: str) -> bool:
         """Set the default AI provider."""
         
-        config = self.load_config()
+        config = dict(self._load_raw_config() or {})
         config['default_provider'] = provider
         return self.save_config(config)
     
@@ -261,18 +411,17 @@ class AIConfigManager:
                 return False
             
             # Provider-specific extra settings
-            current_config = self.get_provider_config(provider)
             extra_config = {}
             
             # For Dify, prompt BASE_URL instead of model
             if provider == 'dify':
-                default_base = current_config.get('base_url', self.default_config['providers']['dify']['base_url'])
+                default_base = self.get_provider_field(provider, 'base_url')
                 base_url = input(f"Enter BASE_URL for Dify (default: {default_base}): ").strip() or default_base
                 extra_config['base_url'] = base_url
                 model = ""  # not required
             else:
                 # Get model (optional, use default if present)
-                default_model = current_config.get('model', self.default_config['providers'].get(provider, {}).get('model'))
+                default_model = self.get_provider_field(provider, 'model')
                 model = ""
                 if default_model is not None:
                     model_in = input(f"Enter model name (default: {default_model}): ").strip()
@@ -316,26 +465,30 @@ class AIConfigManager:
             return False
     
     def _merge_with_defaults(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Merge configuration with defaults."""
+        """Merge configuration with defaults.
+        
+        User values override defaults; dicts present on both sides are merged
+        key by key. The tree is walked with an explicit stack over a private
+        copy of the defaults, so the template itself is never mutated.
+        """
         
-        def merge_dict(target: dict, source: dict):
+        merged = _thaw(_DEFAULT_CONFIG)
+        stack = [(merged, config)]
+        while stack:
+            target, source = stack.pop()
             for key, value in source.items():
-                if key in target and isinstance(target[key], dict) and isinstance(value, dict):
-                    merge_dict(target[key], value)
-                elif key not in target:
-                    target[key] = value
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    stack.append((current, value))
                 else:
-                    # If value exists in source, use it (don't override with defaults)
                     target[key] = value
-        
-        merged = self.default_config.copy()
-        merge_dict(merged, config)
         return merged
     
-    def list_configured_providers(self) -> list:
+    def list_configured_providers(self, *, config: Optional[Mapping[str, Any]] = None) -> list:
         """List all configured providers."""
         
-        config = self.load_config()
+        if config is None:
+            config = self.load_config_readonly()
         configured = []
         
         for provider, settings in config.get('providers', {}).items():
@@ -354,6 +507,8 @@ class AIConfigManager:
         try:
             if self.config_file.exists():
                 self.config_file.unlink()
+            self._cached_config = None
+            self._file_state = 'missing'
             self.logger.info("AI configuration reset to defaults")
             return True
         except Exception as e:
@@ -365,38 +520,38 @@ class AIConfigManager:
         
         env_config = {}
         
-        if not self.env_file.exists():
-            return env_config
-        
         try:
+            # The stat doubles as the existence check
+            try:
+                stat_key = self._stat_key(self.env_file)
+            except FileNotFoundError:
+                return env_config
+            if self._cached_env is not None and self._cached_env[0] == stat_key:
+                return dict(self._cached_env[1])
+            
             with open(self.env_file, 'r', encoding='utf-8') as f:
                 for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip().strip('"\'')
-                        
-                        # Map environment variable names to config keys
-                        if key == 'ANYSPECS_AI_PROVIDER':
-                            env_config['provider'] = value
-                        elif key == 'ANYSPECS_AI_API_KEY':
-                            env_config['api_key'] = value
-                        elif key == 'ANYSPECS_AI_MODEL':
-                            env_config['model'] = value
-                        elif key == 'ANYSPECS_AI_GROUP_ID':
-                            env_config['group_id'] = value
-                        elif key == 'ANYSPECS_AI_TEMPERATURE':
-                            try:
-                                env_config['temperature'] = float(value)
-                            except ValueError:
-                                pass
-                        elif key == 'ANYSPECS_AI_MAX_TOKENS':
-                            try:
-                                env_config['max_tokens'] = int(value)
-                            except ValueError:
-                                pass
+                    key, sep, value = line.partition('=')
+                    if not sep:
+                        continue
+                    
+                    # Map environment variable names to config keys; comments
+                    # and unrelated variables simply miss the table
+                    entry = self._ENV_MAP.get(key.strip())
+                    if entry is None:
+                        continue
+                    
+                    value = value.strip()
+                    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                        value = value[1:-1]
+                    
+                    config_key, coerce = entry
+                    try:
+                        env_config[config_key] = coerce(value)
+                    except ValueError:
+                        pass
             
+            self._cached_env = (stat_key, dict(env_config))
             self.logger.debug(f"Loaded configuration from .env: {list(env_config.keys())}")
             return env_config
             
@@ -408,48 +563,60 @@ class AIConfigManager:
         """Save configuration to .env file."""
         
         try:
-            # Load existing .env content
-            existing_lines = []
-            env_vars = set()
+            # Skip the rewrite when .env already holds exactly these values
+            desired = {'provider': provider}
+            for key in ('api_key', 'model', 'group_id'):
+                if settings.get(key):
+                    desired[key] = settings[key]
+            for key in ('temperature', 'max_tokens'):
+                if settings.get(key) is not None:
+                    desired[key] = settings[key]
+            if self._load_from_env() == desired:
+                self.logger.debug(f".env already up to date: {self.env_file}")
+                return True
             
-            if self.env_file.exists():
+            # Copy existing .env content, dropping previous AnySpecs entries
+            # and noting whether our header is already present in one pass
+            buf = io.StringIO()
+            header_seen = False
+            
+            try:
                 with open(self.env_file, 'r', encoding='utf-8') as f:
                     for line in f:
                         line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key = line.split('=', 1)[0].strip()
-                            env_vars.add(key)
-                        # Keep non-AnySpecs related lines
-                        if not line.startswith('ANYSPECS_AI_'):
-                            existing_lines.append(line)
+                        if line.startswith('ANYSPECS_AI_'):
+                            continue
+                        if line == ENV_HEADER:
+                            header_seen = True
+                        buf.write(line)
+                        buf.write('\n')
+            except FileNotFoundError:
+                pass
             
             # Add/update AnySpecs AI configuration
-            new_lines = existing_lines
-            if not any('# AnySpecs AI Configuration' in line for line in existing_lines):
-                new_lines.extend(['', '# AnySpecs AI Configuration'])
-            new_lines.append(f'ANYSPECS_AI_PROVIDER="{provider}"')
+            if not header_seen:
+                buf.write(f'\n{ENV_HEADER}\n')
+            buf.write(f'ANYSPECS_AI_PROVIDER="{provider}"\n')
             
             if settings.get('api_key'):
-                new_lines.append(f'ANYSPECS_AI_API_KEY="{settings["api_key"]}"')
+                buf.write(f'ANYSPECS_AI_API_KEY="{settings["api_key"]}"\n')
             
             if settings.get('model'):
-                new_lines.append(f'ANYSPECS_AI_MODEL="{settings["model"]}"')
+                buf.write(f'ANYSPECS_AI_MODEL="{settings["model"]}"\n')
             
             if settings.get('group_id'):
-                new_lines.append(f'ANYSPECS_AI_GROUP_ID="{settings["group_id"]}"')
+                buf.write(f'ANYSPECS_AI_GROUP_ID="{settings["group_id"]}"\n')
             
             if settings.get('temperature') is not None:
-                new_lines.append(f'ANYSPECS_AI_TEMPERATURE={settings["temperature"]}')
+                buf.write(f'ANYSPECS_AI_TEMPERATURE={settings["temperature"]}\n')
             
             if settings.get('max_tokens') is not None:
-                new_lines.append(f'ANYSPECS_AI_MAX_TOKENS={settings["max_tokens"]}')
+                buf.write(f'ANYSPECS_AI_MAX_TOKENS={settings["max_tokens"]}\n')
             
-            # Write updated .env file
-            with open(self.env_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(new_lines))
-                if new_lines:  # Add final newline if file has content
-                    f.write('\n')
+            # Write updated .env file atomically
+            self._atomic_write(self.env_file, buf.getvalue().encode('utf-8'))
             
+            self._cached_env = None
             self.logger.info(f"AI configuration saved to .env: {self.env_file}")
             return True
             
@@ -458,5 +625,20 @@ class AIConfigManager:
             return False
 
 
-# Global AI config manager instance
-ai_config = AIConfigManager()
\ No newline at end of file
+# Global AI config manager instance, created on first use
+_instance: Optional[AIConfigManager] = None
+
+
+def get_ai_config() -> AIConfigManager:
+    """Return the shared AI config manager, creating it on first call."""
+    global _instance
+    if _instance is None:
+        _instance = AIConfigManager()
+    return _instance
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from .ai_config import ai_config` working without an import-time instance
+    if name == 'ai_config':
+        return get_ai_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
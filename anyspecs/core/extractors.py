@@ -35,15 +35,17 @@ class BaseExtractor(ABC):
         try:
             # Generate a unique ID for this chat if it doesn't have one
             session_id = str(uuid.uuid4())
-            if 'session' in chat and isinstance(chat['session'], dict):
-                session_id = chat['session'].get('composerId') or chat['session'].get('sessionId', session_id)
+            session = chat.get('session')
+            has_session = isinstance(session, dict)
+            if has_session:
+                session_id = session.get('composerId') or session.get('sessionId', session_id)
             elif 'session_id' in chat:
                 session_id = chat['session_id']
             
             # Format date from various timestamp sources
             date = int(datetime.datetime.now().timestamp())
-            if 'session' in chat and isinstance(chat['session'], dict):
-                created_at = chat['session'].get('createdAt') or chat['session'].get('timestamp')
+            if has_session:
+                created_at = session.get('createdAt') or session.get('timestamp')
                 if created_at and isinstance(created_at, (int, float)):
                     # Handle both seconds and milliseconds timestamps
                     date = created_at / 1000 if created_at > 1e10 else created_at
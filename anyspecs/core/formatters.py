@@ -4,13 +4,118 @@ Export formatters for different output formats.
 
 import json
 import datetime
+import html
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, TextIO
 
+from ..utils import json_utils
 from ..utils.logging import get_logger
 
 logger = get_logger('formatters')
 
+# Code-line heuristic for Markdown export. Tuple startswith/endswith beat a
+# single anchored regex here (timeit, mixed prose/code lines), so only the
+# keyword search after an '=' uses a pattern.
+_CODE_PREFIXES = ('import ', 'from ', 'def ', 'class ', 'if ', 'for ', 'while ',
+                  'const ', 'let ', 'var ', 'function ', '{', '}', '//', '#')
+_CODE_SUFFIXES = (';', '{', '}', ':', '))')
+_JS_KEYWORD_RE = re.compile(r"function|const|let|var|=>")
+
+
+def _looks_like_code(line: str) -> bool:
+    """Return True if an rstripped line looks like a line of source code."""
+    return bool(line.lstrip().startswith(_CODE_PREFIXES) or
+                '=' in line and _JS_KEYWORD_RE.search(line) or
+                line.endswith(_CODE_SUFFIXES))
+
+
+# A line whose first non-blank characters are a ``` fence
+_FENCE_LINE_RE = re.compile(r"^[^\S\n]*```[^\n]*$", re.MULTILINE)
+
+
+def _fenced_to_html(text: str) -> str:
+    """Turn ``` fenced blocks into <pre><code> and other line breaks into <br>.
+
+    Fence lines are located with one regex scan and the runs of lines between
+    them are converted with str.replace, rather than walking line by line.
+    """
+    if "```" not in text:
+        return text.replace("\n", "<br>") + "<br>"
+    
+    parts = []
+    in_code_block = False
+    pos = 0
+    for match in _FENCE_LINE_RE.finditer(text):
+        # Whole lines before this fence, each ending in '\n'
+        run = text[pos:match.start()]
+        if run:
+            parts.append(run.replace("\n", "\n" if in_code_block else "<br>"))
+        if not in_code_block:
+            # Keep whatever follows the opening marker (e.g. the language) as code
+            parts.append("<pre><code>")
+            parts.append(match.group().strip()[3:])
+            parts.append("\n")
+        else:
+            # Anything after the closing marker is dropped
+            parts.append("</code></pre>\n<br>")
+        in_code_block = not in_code_block
+        pos = match.end() + 1
+    
+    # Lines after the last fence; none if the fence was the final line
+    if pos <= len(text):
+        terminator = "\n" if in_code_block else "<br>"
+        parts.append(text[pos:].replace("\n", terminator) + terminator)
+    
+    # Close any unclosed code block at the end
+    if in_code_block:
+        parts.append("</code></pre>")
+    return "".join(parts)
+
+
+# Per-message HTML block, split around the message body. The head depends
+# only on the role, so it is rendered once per role at import.
+_HTML_MESSAGE_HEAD_TEMPLATE = """
+                    <div class="message" style="margin-bottom: 20px;">
+                        <div class="message-header" style="display: flex; align-items: center; margin-bottom: 8px;">
+                            <div class="avatar" style="width: 32px; height: 32px; border-radius: 50%; background-color: {border_color}; color: white; display: flex; justify-content: center; align-items: center; margin-right: 10px;">
+                                {avatar}
+                            </div>
+                            <div class="sender" style="font-weight: bold;">{name}</div>
+                        </div>
+                        <div class="message-content" style="padding: 15px; border-radius: 8px; background-color: {bg_color}; border-left: 4px solid {border_color}; margin-left: {margin_left}; margin-right: {margin_right};">
+                            """
+_HTML_MESSAGE_TAIL = """ 
+                        </div>
+                    </div>
+                    """
+
+
+# avatar, name, bg_color, border_color, margin_left, margin_right per role;
+# any other role is drawn as an assistant message indented on both sides
+_HTML_ROLE_STYLES = {
+    'user': ("👤", "User", "#f0f7ff", "#3f51b5", 0, '40px'),
+    'assistant': ("🤖", "Assistant", "#f0fff7", "#00796b", '40px', 0),
+}
+_HTML_OTHER_ROLE_STYLE = ("🤖", "Assistant", "#f0fff7", "#00796b", '40px', '40px')
+
+
+def _render_html_message_head(style) -> str:
+    """Render the HTML message block up to the body for one role style."""
+    avatar, name, bg_color, border_color, margin_left, margin_right = style
+    return _HTML_MESSAGE_HEAD_TEMPLATE.format_map({
+        'avatar': avatar,
+        'name': name,
+        'bg_color': bg_color,
+        'border_color': border_color,
+        'margin_left': margin_left,
+        'margin_right': margin_right,
+    })
+
+
+_HTML_MESSAGE_HEADS = {role: _render_html_message_head(style) for role, style in _HTML_ROLE_STYLES.items()}
+_HTML_OTHER_MESSAGE_HEAD = _render_html_message_head(_HTML_OTHER_ROLE_STYLE)
+
 
 class BaseFormatter(ABC):
     """Base class for all formatters."""
@@ -24,6 +129,14 @@ class BaseFormatter(ABC):
         """Format a chat session for export."""
         pass
     
+    def iter_format(self, chat: Dict[str, Any]) -> Iterator[str]:
+        """Yield the formatted chat in chunks; by default a single chunk."""
+        yield self.format(chat)
+    
+    def write(self, chat: Dict[str, Any], f: TextIO) -> None:
+        """Write the formatted chat to an open text file as it is produced."""
+        f.writelines(self.iter_format(chat))
+    
     @abstractmethod
     def get_file_extension(self) -> str:
         """Get the file extension for this format."""
@@ -38,8 +151,16 @@ class JSONFormatter(BaseFormatter):
     
     def format(self, chat: Dict[str, Any]) -> str:
         """Format chat as JSON."""
+        if json_utils.ORJSON_AVAILABLE:
+            return json_utils.dumps_pretty(chat, default=str).decode('utf-8')
         return json.dumps(chat, indent=2, ensure_ascii=False, default=str)
     
+    def iter_format(self, chat: Dict[str, Any]) -> Iterator[str]:
+        """Yield the JSON document; one buffer with orjson, encoder-sized chunks otherwise."""
+        if json_utils.ORJSON_AVAILABLE:
+            return iter((self.format(chat),))
+        return json.JSONEncoder(indent=2, ensure_ascii=False, default=str).iterencode(chat)
+    
     def get_file_extension(self) -> str:
         return '.json'
 
@@ -53,108 +174,7 @@ class MarkdownFormatter(BaseFormatter):
     def format(self, chat: Dict[str, Any]) -> str:
         """Format chat as Markdown."""
         try:
-            # Format date for display
-            date_display = "Unknown date"
-            if chat.get('date'):
-                try:
-                    date_obj = datetime.datetime.fromtimestamp(chat['date'])
-                    date_display = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    self.logger.warning(f"Error formatting date: {e}")
-            
-            # Get project info
-            project_name = chat.get('project', {}).get('name', 'Unknown Project')
-            project_path = chat.get('project', {}).get('rootPath', 'Unknown Path')
-            session_id = chat.get('session_id', 'Unknown')
-            source = chat.get('source', 'Unknown')
-            
-            # Build the Markdown content
-            markdown_lines = []
-            
-            # Title and metadata
-            markdown_lines.append(f"# Chat Export: {project_name}")
-            markdown_lines.append("")
-            markdown_lines.append("## Chat Information")
-            markdown_lines.append("")
-            markdown_lines.append(f"- **Project**: {project_name}")
-            markdown_lines.append(f"- **Path**: `{project_path}`")
-            markdown_lines.append(f"- **Date**: {date_display}")
-            markdown_lines.append(f"- **Session ID**: `{session_id}`")
-            markdown_lines.append(f"- **Source**: {source}")
-            markdown_lines.append("")
-            
-            # Messages
-            messages = chat.get('messages', [])
-            
-            if not messages:
-                markdown_lines.append("## Conversation History")
-                markdown_lines.append("")
-                markdown_lines.append("No messages found in this conversation.")
-            else:
-                markdown_lines.append("## Conversation History")
-                markdown_lines.append("")
-                
-                for i, msg in enumerate(messages):
-                    role = msg.get('role', 'unknown')
-                    content = msg.get('content', '')
-                    
-                    if not content or not isinstance(content, str):
-                        content = "Content unavailable"
-                    
-                    # Add role header
-                    role_display = "👤 **User**" if role == "user" else "🤖 **Assistant**"
-                    markdown_lines.append(f"### {role_display}")
-                    markdown_lines.append("")
-                    
-                    # Process content - preserve code blocks and formatting
-                    processed_content = content.strip()
-                    
-                    # If content contains code blocks, keep them as-is
-                    if "```" in processed_content:
-                        markdown_lines.append(processed_content)
-                    else:
-                        # Split by lines and handle potential code snippets
-                        lines = processed_content.split('\n')
-                        in_code_block = False
-                        
-                        for line in lines:
-                            line = line.rstrip()
-                            
-                            # Detect inline code or potential code lines
-                            if (line.strip().startswith(('import ', 'from ', 'def ', 'class ', 'if ', 'for ', 'while ', 
-                                                       'const ', 'let ', 'var ', 'function ', '{', '}', '//', '#')) or
-                                '=' in line and any(keyword in line for keyword in ['function', 'const', 'let', 'var', '=>']) or
-                                line.strip().endswith((';', '{', '}', ':', '))'))):
-                                
-                                if not in_code_block:
-                                    markdown_lines.append("```")
-                                    in_code_block = True
-                                markdown_lines.append(line)
-                            else:
-                                if in_code_block:
-                                    markdown_lines.append("```")
-                                    in_code_block = False
-                                if line.strip():  # Non-empty line
-                                    markdown_lines.append(line)
-                                else:  # Empty line
-                                    markdown_lines.append("")
-                        
-                        # Close any open code block
-                        if in_code_block:
-                            markdown_lines.append("```")
-                    
-                    markdown_lines.append("")
-                    markdown_lines.append("---")  # Separator between messages
-                    markdown_lines.append("")
-            
-            # Footer
-            markdown_lines.append("")
-            markdown_lines.append("---")
-            markdown_lines.append("")
-            markdown_lines.append(f"*Exported from {source} on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-
-            return "\n".join(markdown_lines)
-            
+            return "".join(self.iter_format(chat))
         except Exception as e:
             self.logger.error(f"Error generating Markdown: {e}", exc_info=True)
             return f"""# Error Generating Chat Export
@@ -166,6 +186,108 @@ Please try again or contact support if the problem persists.
 ---
 """
 
+    def iter_format(self, chat: Dict[str, Any]) -> Iterator[str]:
+        """Yield the Markdown export in chunks, one per message."""
+        # Format date for display
+        date_display = "Unknown date"
+        if chat.get('date'):
+            try:
+                date_obj = datetime.datetime.fromtimestamp(chat['date'])
+                date_display = date_obj.strftime("%Y-%m-%d %H:%M:%S")
+            except Exception as e:
+                self.logger.warning(f"Error formatting date: {e}")
+
+        # Get project info
+        project = chat.get('project') or {}
+        project_name = project.get('name', 'Unknown Project')
+        project_path = project.get('rootPath', 'Unknown Path')
+        session_id = chat.get('session_id', 'Unknown')
+        source = chat.get('source', 'Unknown')
+
+        # Build the Markdown content
+        markdown_lines = []
+
+        # Title and metadata
+        markdown_lines.append(f"# Chat Export: {project_name}")
+        markdown_lines.append("")
+        markdown_lines.append("## Chat Information")
+        markdown_lines.append("")
+        markdown_lines.append(f"- **Project**: {project_name}")
+        markdown_lines.append(f"- **Path**: `{project_path}`")
+        markdown_lines.append(f"- **Date**: {date_display}")
+        markdown_lines.append(f"- **Session ID**: `{session_id}`")
+        markdown_lines.append(f"- **Source**: {source}")
+        markdown_lines.append("")
+
+        # Messages
+        messages = chat.get('messages', [])
+
+        if not messages:
+            markdown_lines.append("## Conversation History")
+            markdown_lines.append("")
+            markdown_lines.append("No messages found in this conversation.")
+        else:
+            markdown_lines.append("## Conversation History")
+            markdown_lines.append("")
+
+            for i, msg in enumerate(messages):
+                role = msg.get('role', 'unknown')
+                content = msg.get('content', '')
+
+                if not content or not isinstance(content, str):
+                    content = "Content unavailable"
+
+                # Add role header
+                role_display = "👤 **User**" if role == "user" else "🤖 **Assistant**"
+                markdown_lines.extend((f"### {role_display}", ""))
+
+                # Process content - preserve code blocks and formatting
+                processed_content = content.strip()
+
+                # If content contains code blocks, keep them as-is
+                if "```" in processed_content:
+                    markdown_lines.append(processed_content)
+                else:
+                    # Split by lines and handle potential code snippets
+                    lines = processed_content.split('\n')
+                    in_code_block = False
+
+                    for line in lines:
+                        line = line.rstrip()
+
+                        # Detect inline code or potential code lines
+                        if _looks_like_code(line):
+
+                            if not in_code_block:
+                                markdown_lines.append("```")
+                                in_code_block = True
+                            markdown_lines.append(line)
+                        else:
+                            if in_code_block:
+                                markdown_lines.append("```")
+                                in_code_block = False
+                            if line:  # Non-empty line
+                                markdown_lines.append(line)
+                            else:  # Empty line
+                                markdown_lines.append("")
+
+                    # Close any open code block
+                    if in_code_block:
+                        markdown_lines.append("```")
+
+                markdown_lines.extend(("", "---", ""))  # Separator between messages
+                yield "\n".join(markdown_lines)
+                # Later chunks begin with the newline that joins them to the previous one
+                markdown_lines = [""]
+
+        # Footer
+        markdown_lines.append("")
+        markdown_lines.append("---")
+        markdown_lines.append("")
+        markdown_lines.append(f"*Exported from {source} on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
+
+        yield "\n".join(markdown_lines)
+
     def get_file_extension(self) -> str:
         return '.md'
 
@@ -179,82 +301,31 @@ class HTMLFormatter(BaseFormatter):
     def format(self, chat: Dict[str, Any]) -> str:
         """Format chat as HTML."""
         try:
-            # Format date for display
-            date_display = "Unknown date"
-            if chat.get('date'):
-                try:
-                    date_obj = datetime.datetime.fromtimestamp(chat['date'])
-                    date_display = date_obj.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    self.logger.warning(f"Error formatting date: {e}")
-            
-            # Get project info
-            project_name = chat.get('project', {}).get('name', 'Unknown Project')
-            project_path = chat.get('project', {}).get('rootPath', 'Unknown Path')
-            session_id = chat.get('session_id', 'Unknown')
-            source = chat.get('source', 'Unknown')
-            
-            # Build the HTML content
-            messages_html = ""
-            messages = chat.get('messages', [])
-            
-            if not messages:
-                messages_html = "<p>No messages found in this conversation.</p>"
-            else:
-                for i, msg in enumerate(messages):
-                    role = msg.get('role', 'unknown')
-                    content = msg.get('content', '')
-                    
-                    if not content or not isinstance(content, str):
-                        content = "Content unavailable"
-                    
-                    # Simple HTML escaping
-                    escaped_content = content.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-                    
-                    # Convert markdown code blocks
-                    processed_content = ""
-                    in_code_block = False
-                    for line in escaped_content.split('\n'):
-                        if line.strip().startswith("```"):
-                            if not in_code_block:
-                                processed_content += "<pre><code>"
-                                in_code_block = True
-                                line = line.strip()[3:]  # Remove the first ``` marker
-                            else:
-                                processed_content += "</code></pre>\n"
-                                in_code_block = False
-                                line = ""  # Skip the closing ``` line
-                        
-                        if in_code_block:
-                            processed_content += line + "\n"
-                        else:
-                            processed_content += line + "<br>"
-                    
-                    # Close any unclosed code block at the end
-                    if in_code_block:
-                        processed_content += "</code></pre>"
-                    
-                    avatar = "👤" if role == "user" else "🤖"
-                    name = "User" if role == "user" else "Assistant"
-                    bg_color = "#f0f7ff" if role == "user" else "#f0fff7"
-                    border_color = "#3f51b5" if role == "user" else "#00796b"
-                    
-                    messages_html += f"""
-                    <div class="message" style="margin-bottom: 20px;">
-                        <div class="message-header" style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <div class="avatar" style="width: 32px; height: 32px; border-radius: 50%; background-color: {border_color}; color: white; display: flex; justify-content: center; align-items: center; margin-right: 10px;">
-                                {avatar}
-                            </div>
-                            <div class="sender" style="font-weight: bold;">{name}</div>
-                        </div>
-                        <div class="message-content" style="padding: 15px; border-radius: 8px; background-color: {bg_color}; border-left: 4px solid {border_color}; margin-left: {0 if role == 'user' else '40px'}; margin-right: {0 if role == 'assistant' else '40px'};">
-                            {processed_content} 
-                        </div>
-                    </div>
-                    """
-
-            # Create the complete HTML document
-            html = f"""<!DOCTYPE html>
+            return "".join(self.iter_format(chat))
+        except Exception as e:
+            self.logger.error(f"Error generating HTML: {e}", exc_info=True)
+            return f"<html><body><h1>Error generating chat export</h1><p>Error: {e}</p></body></html>"
+    
+    def iter_format(self, chat: Dict[str, Any]) -> Iterator[str]:
+        """Yield the HTML export in chunks: document head, one per message, then the tail."""
+        # Format date for display
+        date_display = "Unknown date"
+        if chat.get('date'):
+            try:
+                date_obj = datetime.datetime.fromtimestamp(chat['date'])
+                date_display = date_obj.strftime("%Y-%m-%d %H:%M:%S")
+            except Exception as e:
+                self.logger.warning(f"Error formatting date: {e}")
+        
+        # Get project info
+        project = chat.get('project') or {}
+        project_name = project.get('name', 'Unknown Project')
+        project_path = project.get('rootPath', 'Unknown Path')
+        session_id = chat.get('session_id', 'Unknown')
+        source = chat.get('source', 'Unknown')
+        
+        # Document head, up to the messages container
+        yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -286,18 +357,38 @@ class HTMLFormatter(BaseFormatter):
     </div>
     <h2>Conversation History</h2>
     <div class="messages">
-{messages_html}
+"""
+
+        # Messages
+        messages = chat.get('messages', [])
+        
+        if not messages:
+            yield "<p>No messages found in this conversation.</p>"
+        else:
+            for i, msg in enumerate(messages):
+                role = msg.get('role', 'unknown')
+                content = msg.get('content', '')
+                
+                if not content or not isinstance(content, str):
+                    content = "Content unavailable"
+                
+                # Simple HTML escaping
+                escaped_content = html.escape(content, quote=False)
+                
+                # Convert markdown code blocks
+                processed_content = _fenced_to_html(escaped_content)
+                
+                message_head = _HTML_MESSAGE_HEADS.get(role, _HTML_OTHER_MESSAGE_HEAD)
+                yield message_head + processed_content + _HTML_MESSAGE_TAIL
+
+        # Close the messages container, then the footer
+        yield f"""
     </div>
     <footer style="margin-top: 40px; padding-top: 20px; border-top: 1px solid #eee; font-size: 0.9em; color: #666;">
         <p>Exported from {source} on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
     </footer>
 </body>
 </html>"""
-            
-            return html
-        except Exception as e:
-            self.logger.error(f"Error generating HTML: {e}", exc_info=True)
-            return f"<html><body><h1>Error generating chat export</h1><p>Error: {e}</p></body></html>"
-    
+
     def get_file_extension(self) -> str:
         return '.html' 
\ No newline at end of file
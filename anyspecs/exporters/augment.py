@@ -30,7 +30,7 @@ class AugmentExtractor(BaseExtractor):
         all_chats = []
         
         for db_path in db_paths:
-            self.logger.debug(f"Processing database: {db_path}")
+            self.logger.debug("Processing database: %s", db_path)
             chats = self._extract_from_database(db_path)
             all_chats.extend(chats)
         
@@ -145,20 +145,20 @@ class AugmentExtractor(BaseExtractor):
             index_result = cursor.fetchone()
             
             if not index_result:
-                self.logger.debug(f"No chat session index found in {db_path}")
+                self.logger.debug("No chat session index found in %s", db_path)
                 conn.close()
                 return []
             
             # Parse session index
             session_index = json.loads(index_result[0])
-            self.logger.debug(f"Found {len(session_index.get('entries', {}))} chat sessions in {db_path}")
+            self.logger.debug("Found %d chat sessions in %s", len(session_index.get('entries', {})), db_path)
             
             # Get Augment chat records
             cursor.execute("SELECT value FROM ItemTable WHERE key = 'memento/webviewView.augment-chat';")
             chat_result = cursor.fetchone()
             
             if not chat_result:
-                self.logger.debug(f"No Augment chat records found in {db_path}")
+                self.logger.debug("No Augment chat records found in %s", db_path)
                 conn.close()
                 return []
             
@@ -170,7 +170,7 @@ class AugmentExtractor(BaseExtractor):
             conversations = webview_state.get('conversations', {})
             
             if not conversations:
-                self.logger.debug(f"No conversations found in {db_path}")
+                self.logger.debug("No conversations found in %s", db_path)
                 conn.close()
                 return []
             
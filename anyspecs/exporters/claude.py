@@ -3,13 +3,19 @@ Claude Code chat history extractor.
 """
 
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List
 
 from ..core.extractors import BaseExtractor
+from ..utils import json_utils
 from ..utils.paths import get_claude_history_path, get_project_name
 
+# Threads used to read history files concurrently; reads release the GIL
+HISTORY_READ_WORKERS = 8
+
 
 class ClaudeExtractor(BaseExtractor):
     """Extractor for Claude Code chat history."""
@@ -33,8 +39,12 @@ class ClaudeExtractor(BaseExtractor):
         # Group entries by session
         sessions = {}
         
-        for file_info in history_files:
-            entries = self._read_history_file(file_info['path'])
+        # Files are independent, so overlap their reads; map() keeps file order
+        paths = [file_info['path'] for file_info in history_files]
+        with ThreadPoolExecutor(max_workers=min(HISTORY_READ_WORKERS, len(paths))) as pool:
+            file_entries = list(pool.map(self._read_history_file, paths))
+        
+        for file_info, entries in zip(history_files, file_entries):
             for entry in entries:
                 session_id = entry.get('sessionId', 'unknown')
                 
@@ -159,13 +169,14 @@ class ClaudeExtractor(BaseExtractor):
         sessions = []
         
         for chat in chats:
-            session_id = chat.get('session', {}).get('sessionId', 'unknown')[:8]
-            project_name = chat.get('project', {}).get('name', 'Unknown Project')
+            session = chat.get('session') or {}
+            session_id = session.get('sessionId', 'unknown')[:8]
+            project_name = (chat.get('project') or {}).get('name', 'Unknown Project')
             msg_count = len(chat.get('messages', []))
             
             # Format date
             date_str = "Unknown date"
-            created_at = chat.get('session', {}).get('createdAt')
+            created_at = session.get('createdAt')
             if created_at:
                 try:
                     if created_at > 1e10:  # milliseconds
@@ -200,17 +211,26 @@ class ClaudeExtractor(BaseExtractor):
             return []
         
         history_files = []
-        for file_path in project_path.glob('*.jsonl'):
-            try:
-                stat = file_path.stat()
-                history_files.append({
-                    'path': file_path,
-                    'name': file_path.name,
-                    'size': stat.st_size,
-                    'modified': datetime.fromtimestamp(stat.st_mtime)
-                })
-            except Exception as e:
-                self.logger.warning(f"Error reading file info for {file_path}: {e}")
+        # scandir hands back names and stat info without a glob pass per directory
+        try:
+            with os.scandir(project_path) as it:
+                for entry in it:
+                    if not entry.name.endswith('.jsonl'):
+                        continue
+                    file_path = project_path / entry.name
+                    try:
+                        stat = entry.stat()
+                        history_files.append({
+                            'path': file_path,
+                            'name': entry.name,
+                            'size': stat.st_size,
+                            'modified': datetime.fromtimestamp(stat.st_mtime)
+                        })
+                    except Exception as e:
+                        self.logger.warning(f"Error reading file info for {file_path}: {e}")
+        except OSError as e:
+            self.logger.warning(f"Error listing history files in {project_path}: {e}")
+            return []
         
         return sorted(history_files, key=lambda x: x['modified'], reverse=True)
     
@@ -219,14 +239,17 @@ class ClaudeExtractor(BaseExtractor):
         entries = []
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if line:
-                        try:
-                            entry = json.loads(line)
-                            entries.append(entry)
-                        except json.JSONDecodeError as e:
-                            self.logger.warning(f"Invalid JSON on line {line_num} in {file_path}: {e}")
+                raw = f.read()
+            # Text mode already normalizes line endings to '\n'; splitlines() would
+            # also break on separators such as U+2028 that are legal inside JSON strings
+            for line_num, line in enumerate(raw.split('\n'), 1):
+                line = line.strip()
+                if line:
+                    try:
+                        entry = json_utils.loads(line)
+                        entries.append(entry)
+                    except json_utils.JSONDecodeError as e:
+                        self.logger.warning(f"Invalid JSON on line {line_num} in {file_path}: {e}")
         except Exception as e:
             self.logger.error(f"Error reading file {file_path}: {e}")
         
@@ -9,6 +9,7 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 from ..core.extractors import BaseExtractor
+from ..utils import json_utils
 from ..utils.paths import get_project_name
 
 
@@ -85,42 +86,44 @@ class CodexExtractor(BaseExtractor):
         
         try:
             with open(history_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
+                raw = f.read()
+            # Read once and split in C rather than iterating the file object
+            for line_num, line in enumerate(raw.split('\n'), 1):
+                line = line.strip()
+                if not line:
+                    continue
+                
+                try:
+                    entry = json_utils.loads(line)
+                    session_id = entry.get('session_id', f'history_{line_num}')
+                    
+                    # Check if this entry is related to current project
+                    if not self._is_project_related(entry, project_path):
                         continue
                     
-                    try:
-                        entry = json.loads(line)
-                        session_id = entry.get('session_id', f'history_{line_num}')
-                        
-                        # Check if this entry is related to current project
-                        if not self._is_project_related(entry, project_path):
-                            continue
-                        
-                        if session_id not in sessions:
-                            sessions[session_id] = self._create_session_template(session_id, project_path)
+                    if session_id not in sessions:
+                        sessions[session_id] = self._create_session_template(session_id, project_path)
+                    
+                    # Add user message
+                    text = entry.get('text', '')
+                    if text:
+                        sessions[session_id]['messages'].append({
+                            'role': 'user',
+                            'content': text,
+                            'timestamp': entry.get('ts'),
+                            'source': 'history.jsonl'
+                        })
                         
-                        # Add user message
-                        text = entry.get('text', '')
-                        if text:
-                            sessions[session_id]['messages'].append({
-                                'role': 'user',
-                                'content': text,
-                                'timestamp': entry.get('ts'),
-                                'source': 'history.jsonl'
-                            })
+                        # Update timestamps
+                        if entry.get('ts'):
+                            ts = entry['ts']
+                            if sessions[session_id]['metadata']['created_at'] is None:
+                                sessions[session_id]['metadata']['created_at'] = ts
+                            sessions[session_id]['metadata']['last_updated'] = ts
                             
-                            # Update timestamps
-                            if entry.get('ts'):
-                                ts = entry['ts']
-                                if sessions[session_id]['metadata']['created_at'] is None:
-                                    sessions[session_id]['metadata']['created_at'] = ts
-                                sessions[session_id]['metadata']['last_updated'] = ts
-                                
-                    except json.JSONDecodeError as e:
-                        self.logger.warning(f"Invalid JSON in history.jsonl line {line_num}: {e}")
-                        continue
+                except json_utils.JSONDecodeError as e:
+                    self.logger.warning(f"Invalid JSON in history.jsonl line {line_num}: {e}")
+                    continue
                         
         except Exception as e:
             self.logger.warning(f"Error reading history.jsonl: {e}")
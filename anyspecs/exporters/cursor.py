@@ -2,15 +2,116 @@
 Cursor AI chat history extractor.
 """
 
-import json
+import os
+import posixpath
 import sqlite3
+import sys
 import pathlib
 from collections import defaultdict
-from typing import Dict, Any, List, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from operator import itemgetter
+from typing import Dict, Any, List, Iterable, Optional, Tuple
 
 from ..core.extractors import BaseExtractor
+from ..utils import json_utils
 from ..utils.paths import get_cursor_root, extract_project_name_from_path
 
+# Read-side tuning applied to every connection; all scans are read-only.
+# locking_mode=EXCLUSIVE is deliberately not used: Cursor keeps these
+# databases open in WAL mode and an exclusive reader would fail or block it.
+_RO_PRAGMAS = (
+    "PRAGMA query_only=1",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Composer blobs at least this large are streamed with ijson, when installed,
+# keeping only the fields extract_chats reads
+_COMPOSER_STREAM_THRESHOLD = 128 * 1024
+_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+
+# Shared role strings for every extracted message
+_USER = sys.intern("user")
+_ASSISTANT = sys.intern("assistant")
+
+# Metadata for sessions that no workspace describes; only ever copied
+_UNTITLED_META = {"title": "(untitled)", "createdAt": None, "lastUpdatedAt": None}
+
+# ItemTable keys read from each workspace database; history.entries is
+# projected separately through JSON1 (see _SQL_HISTORY_RESOURCES)
+_WORKSPACE_ITEM_KEYS = (
+    "debug.selectedroot",
+    "composer.composerData",
+    "workbench.panel.aichat.view.aichat.chatdata",
+    "aiService.prompts",
+    "aiService.generations",
+)
+
+# SQL text shared by every call site so each connection's statement cache hits
+_SQL_ITEMTABLE_KEYS = (
+    f"SELECT key, value FROM ItemTable WHERE key IN ({','.join('?' * len(_WORKSPACE_ITEM_KEYS))})"
+)
+_SQL_ITEMTABLE_VALUE = "SELECT value FROM ItemTable WHERE key = ?"
+_SQL_HISTORY_RESOURCES = (
+    "SELECT json_extract(je.value, '$.editor.resource') "
+    "FROM ItemTable, json_each(CAST(ItemTable.value AS TEXT)) AS je "
+    "WHERE ItemTable.key = 'history.entries'"
+)
+_SQL_HAS_DISKKV = "SELECT name FROM sqlite_master WHERE type='table' AND name='cursorDiskKV'"
+_SQL_DISKKV_CHAT_ROWS = (
+    "SELECT key, value FROM cursorDiskKV WHERE key LIKE 'bubbleId:%' OR key LIKE 'composerData:%'"
+)
+# Same rows, minus bubbles whose text and richText are both empty. Rows that
+# are not valid JSON are kept so the Python side still logs and skips them.
+_SQL_DISKKV_CHAT_ROWS_FILTERED = (
+    "SELECT key, value FROM cursorDiskKV "
+    "WHERE key LIKE 'composerData:%' "
+    "OR (key LIKE 'bubbleId:%' AND CASE WHEN json_valid(CAST(value AS TEXT)) THEN "
+    "COALESCE(json_extract(CAST(value AS TEXT), '$.text'), '') != '' "
+    "OR json_extract(CAST(value AS TEXT), '$.richText') IS NOT NULL "
+    "ELSE 1 END)"
+)
+
+
+def _open_ro(db: pathlib.Path) -> sqlite3.Connection:
+    """Open a Cursor SQLite database read-only with read-oriented pragmas."""
+    con = sqlite3.connect(f"file:{db}?mode=ro", uri=True, cached_statements=256)
+    for pragma in _RO_PRAGMAS:
+        try:
+            con.execute(pragma)
+        except sqlite3.DatabaseError:
+            # Tuning only; a failing pragma must not stop extraction
+            pass
+    return con
+
+
+def _default_meta(cid: str, created_at=None) -> Dict[str, Any]:
+    """Placeholder metadata for a chat known only by its id."""
+    return {"title": f"Chat {cid[:8]}", "createdAt": created_at, "lastUpdatedAt": created_at}
+
+
+def _stream_composer_data(raw) -> Dict[str, Any]:
+    """Parse only createdAt and each conversation message's type/text from a composer blob."""
+    data: Dict[str, Any] = {}
+    conversation = []
+    msg = None
+    for prefix, event, value in json_utils.iter_events(raw):
+        if prefix == "conversation.item":
+            if event == "start_map":
+                msg = {}
+            elif event == "end_map":
+                conversation.append(msg)
+        elif prefix in ("conversation.item.type", "conversation.item.text"):
+            if event in _SCALAR_EVENTS:
+                msg[prefix[len("conversation.item."):]] = value
+        elif prefix == "createdAt" and event in _SCALAR_EVENTS:
+            data["createdAt"] = value
+        elif prefix == "conversation" and event == "start_array":
+            data["conversation"] = conversation
+    return data
+
 
 class CursorExtractor(BaseExtractor):
     """Extractor for Cursor AI chat history."""
@@ -27,31 +128,18 @@ class CursorExtractor(BaseExtractor):
         ws_proj: Dict[str, Dict[str, Any]] = {}
         comp_meta: Dict[str, Dict[str, Any]] = {}
         comp2ws: Dict[str, str] = {}
-        sessions: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"messages": []})
+        sessions: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"roles": [], "contents": []})
 
-        # 1. Process workspace DBs first
+        # 1. Process workspace DBs first. Each database is independent, so
+        # they are read in worker threads and merged here in workspace order.
         self.logger.debug("Processing workspace databases...")
-        ws_count = 0
-        for ws_id, db in self._get_workspaces(root):
-            ws_count += 1
-            self.logger.debug(f"Processing workspace {ws_id} - {db}")
-            proj, meta = self._get_workspace_info(db)
-            ws_proj[ws_id] = proj
-            for cid, m in meta.items():
-                comp_meta[cid] = m
-                comp2ws[cid] = ws_id
-
-            # Extract chat data from workspace's state.vscdb
-            msg_count = 0
-            for cid, role, text, db_path in self._extract_chat_from_item_table(db):
-                sessions[cid]["messages"].append({"role": role, "content": text})
-                if "db_path" not in sessions[cid]:
-                    sessions[cid]["db_path"] = db_path
-                msg_count += 1
-                if cid not in comp_meta:
-                    comp_meta[cid] = {"title": f"Chat {cid[:8]}", "createdAt": None, "lastUpdatedAt": None}
-                    comp2ws[cid] = ws_id
-            self.logger.debug(f"  - Extracted {msg_count} messages from workspace {ws_id}")
+        workspaces = list(self._get_workspaces(root))
+        ws_count = len(workspaces)
+        max_workers = min(8, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(lambda ws: self._process_workspace(*ws), workspaces)
+            for (ws_id, _), (proj, meta, messages) in zip(workspaces, results):
+                self._merge_workspace(ws_id, proj, meta, messages, ws_proj, comp_meta, comp2ws, sessions)
 
         self.logger.debug(f"Processed {ws_count} workspaces")
 
@@ -59,32 +147,41 @@ class CursorExtractor(BaseExtractor):
         global_db = self._get_global_storage_path(root)
         if global_db:
             self.logger.debug(f"Processing global storage: {global_db}")
-            # Extract bubbles from cursorDiskKV
+            # Bubbles and composers come from one cursorDiskKV scan; bubbles are
+            # merged as they arrive and composers afterwards, as before. Only the
+            # raw composer rows are held; each is decoded when it is merged.
+            composers = []
             msg_count = 0
-            for cid, role, text, db_path in self._extract_bubbles_from_disk_kv(global_db):
-                sessions[cid]["messages"].append({"role": role, "content": text})
-                if "db_path" not in sessions[cid]:
-                    sessions[cid]["db_path"] = db_path
+            for row in self._iter_disk_kv(global_db):
+                if row[0] == "composer":
+                    composers.append(row[1:])
+                    continue
+                _, cid, role, text, db_path = row
+                session = sessions[cid]
+                session["roles"].append(role)
+                session["contents"].append(text)
+                if "db_path" not in session:
+                    session["db_path"] = db_path
                 msg_count += 1
                 if cid not in comp_meta:
-                    comp_meta[cid] = {"title": f"Chat {cid[:8]}", "createdAt": None, "lastUpdatedAt": None}
+                    comp_meta[cid] = _default_meta(cid)
                     comp2ws[cid] = "(global)"
             self.logger.debug(f"  - Extracted {msg_count} messages from global cursorDiskKV bubbles")
 
             # Extract composer data
             comp_count = 0
-            for cid, data, db_path in self._extract_composer_data(global_db):
+            for key, raw, db_path in composers:
+                parsed = self._parse_composer_row(key, raw)
+                if parsed is None:
+                    continue
+                cid, data = parsed
                 if cid not in comp_meta:
-                    created_at = data.get("createdAt")
-                    comp_meta[cid] = {
-                        "title": f"Chat {cid[:8]}",
-                        "createdAt": created_at,
-                        "lastUpdatedAt": created_at
-                    }
+                    comp_meta[cid] = _default_meta(cid, data.get("createdAt"))
                     comp2ws[cid] = "(global)"
 
-                if "db_path" not in sessions[cid]:
-                    sessions[cid]["db_path"] = db_path
+                session = sessions[cid]
+                if "db_path" not in session:
+                    session["db_path"] = db_path
 
                 # Extract conversation from composer data
                 conversation = data.get("conversation", [])
@@ -96,33 +193,39 @@ class CursorExtractor(BaseExtractor):
                             continue
 
                         # Type 1 = user, Type 2 = assistant
-                        role = "user" if msg_type == 1 else "assistant"
+                        role = _USER if msg_type == 1 else _ASSISTANT
                         content = msg.get("text", "")
                         if content and isinstance(content, str):
-                            sessions[cid]["messages"].append({"role": role, "content": content})
+                            session["roles"].append(role)
+                            session["contents"].append(content)
                             msg_count += 1
 
                     if msg_count > 0:
                         comp_count += 1
-                        self.logger.debug(f"  - Added {msg_count} messages from composer {cid[:8]}")
+                        self.logger.debug("  - Added %d messages from composer %s", msg_count, cid[:8])
 
             if comp_count > 0:
                 self.logger.debug(f"  - Extracted data from {comp_count} composers in global cursorDiskKV")
 
-        # 3. Build final list
-        out = []
+        # 3. Order sessions by last updated time, then build the output dicts
+        records = []
         for cid, data in sessions.items():
-            if not data["messages"]:
+            if not data["roles"]:
                 continue
+            meta = comp_meta.get(cid, _UNTITLED_META)
+            records.append((meta.get("lastUpdatedAt") or 0, cid, meta, data))
+        records.sort(key=itemgetter(0), reverse=True)
+
+        out = []
+        for _, cid, meta, data in records:
             ws_id = comp2ws.get(cid, "(unknown)")
             project = ws_proj.get(ws_id, {"name": "(unknown)", "rootPath": "(unknown)"})
-            meta = comp_meta.get(cid, {"title": "(untitled)", "createdAt": None, "lastUpdatedAt": None})
 
             # Create the output object with the db_path included
             chat_data = {
                 "project": project,
                 "session": {"composerId": cid, **meta},
-                "messages": data["messages"],
+                "messages": [{"role": r, "content": c} for r, c in zip(data["roles"], data["contents"])],
                 "workspace_id": ws_id,
             }
 
@@ -132,8 +235,6 @@ class CursorExtractor(BaseExtractor):
 
             out.append(chat_data)
 
-        # Sort by last updated time if available
-        out.sort(key=lambda s: s["session"].get("lastUpdatedAt") or 0, reverse=True)
         self.logger.debug(f"Total chat sessions extracted: {len(out)}")
         return out
     
@@ -147,15 +248,17 @@ class CursorExtractor(BaseExtractor):
         current_project = get_project_name().lower()
         
         for chat in chats:
-            session_id = chat.get('session', {}).get('composerId', 'unknown')[:8]
-            project_name = chat.get('project', {}).get('name', 'Unknown Project')
+            session = chat.get('session') or {}
+            session_id = session.get('composerId', 'unknown')[:8]
+            project_name = (chat.get('project') or {}).get('name', 'Unknown Project')
             msg_count = len(chat.get('messages', []))
             
             # Only include sessions from current workspace/project
-            if current_project in project_name.lower() or project_name.lower() in current_project:
+            project_lower = project_name.lower()
+            if current_project in project_lower or project_lower in current_project:
                 # Format date
                 date_str = "Unknown date"
-                created_at = chat.get('session', {}).get('createdAt')
+                created_at = session.get('createdAt')
                 if created_at:
                     try:
                         import datetime
@@ -185,6 +288,54 @@ class CursorExtractor(BaseExtractor):
         
         return sessions
 
+    def _process_workspace(self, ws_id: str, db: pathlib.Path):
+        """Read one workspace database; safe to run in a worker thread.
+
+        Returns (project, composer_meta, messages) where messages is a list of
+        (composerId, role, text, db_path) tuples.
+        """
+        self.logger.debug("Processing workspace %s - %s", ws_id, db)
+        try:
+            con = _open_ro(db)
+        except sqlite3.DatabaseError as e:
+            self.logger.debug(f"Error opening workspace database {db}: {e}")
+            return {"name": "(unknown)", "rootPath": "(unknown)"}, {}, []
+
+        # One query fetches every ItemTable value both passes below need,
+        # plus one that pulls only the resource paths out of history.entries
+        with closing(con):
+            try:
+                cur = con.cursor()
+                items = self._get_item_values(cur)
+                paths = self._get_history_paths(cur)
+            except sqlite3.DatabaseError as e:
+                self.logger.debug(f"Error reading ItemTable from {db}: {e}")
+                items = {}
+                paths = []
+
+        proj, meta = self._get_workspace_info(items, paths)
+        messages = list(self._extract_chat_from_item_table(items, db))
+        return proj, meta, messages
+
+    def _merge_workspace(self, ws_id, proj, meta, messages, ws_proj, comp_meta, comp2ws, sessions) -> None:
+        """Merge one workspace's results into the shared lookup maps."""
+        ws_proj[ws_id] = proj
+        for cid, m in meta.items():
+            comp_meta[cid] = m
+            comp2ws[cid] = ws_id
+
+        # Chat data from workspace's state.vscdb
+        for cid, role, text, db_path in messages:
+            session = sessions[cid]
+            session["roles"].append(role)
+            session["contents"].append(text)
+            if "db_path" not in session:
+                session["db_path"] = db_path
+            if cid not in comp_meta:
+                comp_meta[cid] = _default_meta(cid)
+                comp2ws[cid] = ws_id
+        self.logger.debug("  - Extracted %d messages from workspace %s", len(messages), ws_id)
+
     def _get_workspaces(self, base: pathlib.Path):
         """Get workspace databases."""
         ws_root = base / "User" / "workspaceStorage"
@@ -211,220 +362,205 @@ class CursorExtractor(BaseExtractor):
 
         return None
 
-    def _j(self, cur: sqlite3.Cursor, table: str, key: str):
-        """Helper to parse JSON from database."""
-        cur.execute(f"SELECT value FROM {table} WHERE key=?", (key,))
-        row = cur.fetchone()
-        if row:
+    def _get_item_values(self, cur: sqlite3.Cursor) -> Dict[str, Any]:
+        """Fetch and parse the workspace ItemTable JSON values with a single query."""
+        cur.execute(_SQL_ITEMTABLE_KEYS, _WORKSPACE_ITEM_KEYS)
+        items = {}
+        for key, value in cur:
             try:
-                return json.loads(row[0])
+                items[key] = json_utils.loads(value)
             except Exception as e:
-                self.logger.debug(f"Failed to parse JSON for {key}: {e}")
-        return None
+                self.logger.debug("Failed to parse JSON for %s: %s", key, e)
+        return items
 
-    def _get_workspace_info(self, db: pathlib.Path):
-        """Get workspace information."""
+    def _get_history_paths(self, cur: sqlite3.Cursor) -> List[str]:
+        """Return history.entries file paths with the file:/// scheme stripped."""
         try:
-            con = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
-            cur = con.cursor()
-
-            # Get file paths from history entries to extract the project name
-            proj = {"name": "(unknown)", "rootPath": "(unknown)"}
-            ents = self._j(cur, "ItemTable", "history.entries") or []
-
-            # Extract file paths from history entries, stripping the file:/// scheme
-            paths = []
-            for e in ents:
-                resource = e.get("editor", {}).get("resource", "")
-                if resource and resource.startswith("file:///"):
-                    paths.append(resource[len("file:///"):])
-
-            # If we found file paths, extract the project name using the longest common prefix
-            if paths:
-                import os
-                common_prefix = os.path.commonprefix(paths)
-                last_separator_index = common_prefix.rfind('/')
-                if last_separator_index > 0:
-                    project_root = common_prefix[:last_separator_index]
-                    project_name = extract_project_name_from_path(project_root)
-                    proj = {"name": project_name, "rootPath": "/" + project_root.lstrip('/')}
-
-            # Try backup methods if we didn't get a project name
-            if proj["name"] == "(unknown)":
-                selected_root = self._j(cur, "ItemTable", "debug.selectedroot")
-                if selected_root and isinstance(selected_root, str) and selected_root.startswith("file:///"):
-                    path = selected_root[len("file:///"):]
-                    if path:
-                        root_path = "/" + path.strip("/")
-                        project_name = extract_project_name_from_path(root_path)
-                        if project_name:
-                            proj = {"name": project_name, "rootPath": root_path}
-
-            # composers meta
-            comp_meta = {}
-            cd = self._j(cur, "ItemTable", "composer.composerData") or {}
-            for c in cd.get("allComposers", []):
-                comp_meta[c["composerId"]] = {
-                    "title": c.get("name", "(untitled)"),
-                    "createdAt": c.get("createdAt"),
-                    "lastUpdatedAt": c.get("lastUpdatedAt")
-                }
-
-            # Try to get composer info from workbench.panel.aichat.view.aichat.chatdata
-            chat_data = self._j(cur, "ItemTable", "workbench.panel.aichat.view.aichat.chatdata") or {}
-            for tab in chat_data.get("tabs", []):
-                tab_id = tab.get("tabId")
-                if tab_id and tab_id not in comp_meta:
-                    comp_meta[tab_id] = {
-                        "title": f"Chat {tab_id[:8]}",
-                        "createdAt": None,
-                        "lastUpdatedAt": None
-                    }
-        except sqlite3.DatabaseError as e:
-            self.logger.debug(f"Error getting workspace info from {db}: {e}")
-            proj = {"name": "(unknown)", "rootPath": "(unknown)"}
-            comp_meta = {}
-        finally:
-            if 'con' in locals():
-                con.close()
-
-        return proj, comp_meta
-
-    def _extract_bubbles_from_disk_kv(self, db: pathlib.Path) -> Iterable[Tuple[str, str, str, str]]:
-        """Yield (composerId, role, text, db_path) from cursorDiskKV table."""
-        try:
-            con = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
-            cur = con.cursor()
-            # Check if table exists
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='cursorDiskKV'")
-            if not cur.fetchone():
-                con.close()
-                return
-
-            cur.execute("SELECT key, value FROM cursorDiskKV WHERE key LIKE 'bubbleId:%'")
-        except sqlite3.DatabaseError as e:
-            self.logger.debug(f"Database error with {db}: {e}")
-            return
-
-        db_path_str = str(db)
-
-        for k, v in cur.fetchall():
+            # Let SQLite walk the JSON array and project editor.resource
+            cur.execute(_SQL_HISTORY_RESOURCES)
+            resources = [resource for (resource,) in cur]
+        except sqlite3.OperationalError as e:
+            # JSON1 unavailable or the value is not valid JSON; parse it here
+            self.logger.debug("Falling back to Python parsing of history.entries: %s", e)
+            cur.execute(_SQL_ITEMTABLE_VALUE, ("history.entries",))
+            row = cur.fetchone()
             try:
-                if v is None:
-                    continue
-
-                b = json.loads(v)
+                ents = (json_utils.loads(row[0]) if row else None) or []
             except Exception as e:
-                self.logger.debug(f"Failed to parse bubble JSON for key {k}: {e}")
-                continue
-
-            txt = (b.get("text") or b.get("richText") or "").strip()
-            if not txt:
-                continue
-            role = "user" if b.get("type") == 1 else "assistant"
-            composerId = k.split(":")[1]  # Format is bubbleId:composerId:bubbleId
-            yield composerId, role, txt, db_path_str
+                self.logger.debug("Failed to parse JSON for history.entries: %s", e)
+                ents = []
+            resources = [e.get("editor", {}).get("resource", "") for e in ents]
+
+        return [
+            resource[len("file:///"):]
+            for resource in resources
+            if isinstance(resource, str) and resource.startswith("file:///")
+        ]
+
+    def _get_workspace_info(self, items: Dict[str, Any], paths: List[str]):
+        """Get workspace information from parsed ItemTable values and history paths."""
+        # Use file paths from history entries to extract the project name
+        proj = {"name": "(unknown)", "rootPath": "(unknown)"}
+
+        # If we found file paths, extract the project name from their common parent directory
+        if paths:
+            try:
+                project_root = posixpath.commonpath([posixpath.dirname(p) for p in paths])
+            except ValueError:
+                project_root = None
+            if project_root:
+                project_name = extract_project_name_from_path(project_root)
+                proj = {"name": project_name, "rootPath": "/" + project_root.lstrip('/')}
+
+        # Try backup methods if we didn't get a project name
+        if proj["name"] == "(unknown)":
+            selected_root = items.get("debug.selectedroot")
+            if selected_root and isinstance(selected_root, str) and selected_root.startswith("file:///"):
+                path = selected_root[len("file:///"):]
+                if path:
+                    root_path = "/" + path.strip("/")
+                    project_name = extract_project_name_from_path(root_path)
+                    if project_name:
+                        proj = {"name": project_name, "rootPath": root_path}
+
+        # composers meta
+        comp_meta = {}
+        cd = items.get("composer.composerData") or {}
+        for c in cd.get("allComposers", []):
+            comp_meta[c["composerId"]] = {
+                "title": c.get("name", "(untitled)"),
+                "createdAt": c.get("createdAt"),
+                "lastUpdatedAt": c.get("lastUpdatedAt")
+            }
 
-        con.close()
+        # Try to get composer info from workbench.panel.aichat.view.aichat.chatdata
+        chat_data = items.get("workbench.panel.aichat.view.aichat.chatdata") or {}
+        for tab in chat_data.get("tabs", []):
+            tab_id = tab.get("tabId")
+            if tab_id and tab_id not in comp_meta:
+                comp_meta[tab_id] = _default_meta(tab_id)
 
-    def _extract_chat_from_item_table(self, db: pathlib.Path) -> Iterable[Tuple[str, str, str, str]]:
-        """Yield (composerId, role, text, db_path) from ItemTable."""
-        try:
-            con = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
-            cur = con.cursor()
-
-            # Try to get chat data from workbench.panel.aichat.view.aichat.chatdata
-            chat_data = self._j(cur, "ItemTable", "workbench.panel.aichat.view.aichat.chatdata")
-            if chat_data and "tabs" in chat_data:
-                for tab in chat_data.get("tabs", []):
-                    tab_id = tab.get("tabId", "unknown")
-                    for bubble in tab.get("bubbles", []):
-                        bubble_type = bubble.get("type")
-                        if not bubble_type:
-                            continue
-
-                        # Extract text from various possible fields
-                        text = ""
-                        if "text" in bubble:
-                            text = bubble["text"]
-                        elif "content" in bubble:
-                            text = bubble["content"]
-
-                        if text and isinstance(text, str):
-                            role = "user" if bubble_type == "user" else "assistant"
-                            yield tab_id, role, text, str(db)
-
-            # Check for composer data
-            composer_data = self._j(cur, "ItemTable", "composer.composerData")
-            if composer_data:
-                for comp in composer_data.get("allComposers", []):
-                    comp_id = comp.get("composerId", "unknown")
-                    messages = comp.get("messages", [])
-                    for msg in messages:
-                        role = msg.get("role", "unknown")
-                        content = msg.get("content", "")
-                        if content:
-                            yield comp_id, role, content, str(db)
-
-            # Also check for aiService entries
-            prompts_data = self._j(cur, "ItemTable", "aiService.prompts")
-            generations_data = self._j(cur, "ItemTable", "aiService.generations")
-
-            if prompts_data or generations_data:
-                combined_id = "aiService_combined"
-
-                # Add user prompts
-                if isinstance(prompts_data, list):
-                    for item in prompts_data:
-                        if isinstance(item, dict) and "text" in item:
-                            text = item.get("text", "").strip()
-                            if text:
-                                yield combined_id, "user", text, str(db)
-
-                # Add AI generations
-                if isinstance(generations_data, list):
-                    for item in generations_data:
-                        if isinstance(item, dict) and "textDescription" in item:
-                            text = item.get("textDescription", "").strip()
-                            if text:
-                                yield combined_id, "assistant", text, str(db)
+        return proj, comp_meta
 
-        except sqlite3.DatabaseError as e:
-            self.logger.debug(f"Database error in ItemTable with {db}: {e}")
-            return
-        finally:
-            if 'con' in locals():
-                con.close()
+    def _iter_disk_kv(self, db: pathlib.Path) -> Iterable[Tuple]:
+        """Yield chat rows from the cursorDiskKV table in a single scan.
 
-    def _extract_composer_data(self, db: pathlib.Path) -> Iterable[Tuple[str, dict, str]]:
-        """Yield (composerId, composerData, db_path) from cursorDiskKV table."""
+        Rows are tagged tuples: ("bubble", composerId, role, text, db_path)
+        or ("composer", key, raw_value, db_path). Composer values are left
+        undecoded; see _parse_composer_row.
+        """
         try:
-            con = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
-            cur = con.cursor()
-            # Check if table exists
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='cursorDiskKV'")
-            if not cur.fetchone():
-                con.close()
-                return
-
-            cur.execute("SELECT key, value FROM cursorDiskKV WHERE key LIKE 'composerData:%'")
+            con = _open_ro(db)
         except sqlite3.DatabaseError as e:
             self.logger.debug(f"Database error with {db}: {e}")
             return
 
-        db_path_str = str(db)
-
-        for k, v in cur.fetchall():
+        with closing(con):
             try:
-                if v is None:
-                    continue
+                cur = con.cursor()
+                # Check if table exists
+                cur.execute(_SQL_HAS_DISKKV)
+                if not cur.fetchone():
+                    return
+
+                try:
+                    cur.execute(_SQL_DISKKV_CHAT_ROWS_FILTERED)
+                except sqlite3.OperationalError:
+                    # No JSON1 support; filter empty bubbles in Python instead
+                    cur.execute(_SQL_DISKKV_CHAT_ROWS)
+            except sqlite3.DatabaseError as e:
+                self.logger.debug(f"Database error with {db}: {e}")
+                return
 
-                composer_data = json.loads(v)
-                composer_id = k.split(":")[1]
-                yield composer_id, composer_data, db_path_str
+            db_path_str = str(db)
 
-            except Exception as e:
-                self.logger.debug(f"Failed to parse composer data for key {k}: {e}")
-                continue
+            # Stream rows from the cursor rather than materializing them all
+            for k, v in cur:
+                if v is None:
+                    continue
 
-        con.close() 
\ No newline at end of file
+                if k.startswith("bubbleId:"):
+                    try:
+                        b = json_utils.loads(v)
+                    except Exception as e:
+                        self.logger.debug("Failed to parse bubble JSON for key %s: %s", k, e)
+                        continue
+
+                    txt = (b.get("text") or b.get("richText") or "").strip()
+                    if not txt:
+                        continue
+                    role = _USER if b.get("type") == 1 else _ASSISTANT
+                    composerId = k.split(":")[1]  # Format is bubbleId:composerId:bubbleId
+                    yield "bubble", composerId, role, txt, db_path_str
+                else:
+                    yield "composer", k, v, db_path_str
+
+    def _parse_composer_row(self, k: str, v) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Decode a composerData row into (composerId, data), or None if unparsable."""
+        try:
+            if json_utils.IJSON_AVAILABLE and len(v) >= _COMPOSER_STREAM_THRESHOLD:
+                composer_data = _stream_composer_data(v)
+            else:
+                composer_data = json_utils.loads(v)
+            return k.split(":")[1], composer_data
+        except Exception as e:
+            self.logger.debug("Failed to parse composer data for key %s: %s", k, e)
+            return None
+
+    def _extract_chat_from_item_table(self, items: Dict[str, Any], db: pathlib.Path) -> Iterable[Tuple[str, str, str, str]]:
+        """Yield (composerId, role, text, db_path) from parsed ItemTable values."""
+        # Try to get chat data from workbench.panel.aichat.view.aichat.chatdata
+        chat_data = items.get("workbench.panel.aichat.view.aichat.chatdata")
+        if chat_data and "tabs" in chat_data:
+            for tab in chat_data.get("tabs", []):
+                tab_id = tab.get("tabId", "unknown")
+                for bubble in tab.get("bubbles", []):
+                    bubble_type = bubble.get("type")
+                    if not bubble_type:
+                        continue
+
+                    # Extract text from various possible fields
+                    text = ""
+                    if "text" in bubble:
+                        text = bubble["text"]
+                    elif "content" in bubble:
+                        text = bubble["content"]
+
+                    if text and isinstance(text, str):
+                        role = _USER if bubble_type == "user" else _ASSISTANT
+                        yield tab_id, role, text, str(db)
+
+        # Check for composer data
+        composer_data = items.get("composer.composerData")
+        if composer_data:
+            for comp in composer_data.get("allComposers", []):
+                comp_id = comp.get("composerId", "unknown")
+                messages = comp.get("messages", [])
+                for msg in messages:
+                    role = msg.get("role", "unknown")
+                    content = msg.get("content", "")
+                    if content:
+                        yield comp_id, role, content, str(db)
+
+        # Also check for aiService entries
+        prompts_data = items.get("aiService.prompts")
+        generations_data = items.get("aiService.generations")
+
+        if prompts_data or generations_data:
+            combined_id = "aiService_combined"
+
+            # Add user prompts
+            if isinstance(prompts_data, list):
+                for item in prompts_data:
+                    if isinstance(item, dict) and "text" in item:
+                        text = item.get("text", "").strip()
+                        if text:
+                            yield combined_id, _USER, text, str(db)
+
+            # Add AI generations
+            if isinstance(generations_data, list):
+                for item in generations_data:
+                    if isinstance(item, dict) and "textDescription" in item:
+                        text = item.get("textDescription", "").strip()
+                        if text:
+                            yield combined_id, _ASSISTANT, text, str(db)
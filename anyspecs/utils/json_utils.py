@@ -0,0 +1,59 @@
+"""
+JSON helpers that use orjson (and ijson for streaming) when installed.
+"""
+
+import io
+import json
+from typing import Any, Callable, Iterator, Optional, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document from str or bytes."""
+        return orjson.loads(data)
+
+    def dumps_pretty(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes indented by two spaces.
+
+        default handles unsupported types as in json.dumps; datetimes are
+        passed to it too, so output matches the stdlib fallback.
+        """
+        option = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        if default is not None:
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=default, option=option)
+
+else:
+    JSONDecodeError = json.JSONDecodeError  # type: ignore[misc]
+
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document from str or bytes."""
+        return json.loads(data)
+
+    def dumps_pretty(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes indented by two spaces."""
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=default).encode('utf-8')
+
+
+def iter_events(data: Union[str, bytes]) -> Iterator[Tuple[str, str, Any]]:
+    """Stream (prefix, event, value) parse events for a JSON document.
+
+    Requires ijson; check IJSON_AVAILABLE first.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return ijson.parse(io.BytesIO(data), use_float=True)
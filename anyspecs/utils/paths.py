@@ -2,10 +2,25 @@
 Path utilities and project name extraction.
 """
 
+import functools
 import os
 import platform
 import pathlib
-from typing import Optional
+from typing import Dict, Optional
+
+from .logging import get_logger
+
+logger = get_logger('paths')
+
+
+# Lookup sets for extract_project_name_from_path
+_HOME_DIR_PATTERNS = frozenset({'Users', 'home'})
+_KNOWN_PROJECTS = frozenset({'genaisf', 'cursor-view', 'cursor', 'cursor-apps', 'universal-github', 'inquiry'})
+_PROJECT_CONTAINERS = frozenset({'Documents', 'Projects', 'Code', 'workspace', 'repos', 'git', 'src', 'codebase'})
+_SYSTEM_DIRS = frozenset({'Library', 'Applications', 'System', 'var', 'opt', 'tmp'})
+
+# Current username, resolved once at import
+_CURRENT_USERNAME = os.path.basename(os.path.expanduser('~'))
 
 
 def get_project_name() -> str:
@@ -61,46 +76,58 @@ def get_claude_history_path(project_path: Optional[str] = None) -> pathlib.Path:
 
 def extract_project_name_from_path(root_path: str, debug: bool = False) -> str:
     """Extract a project name from a path, skipping user directories."""
+    project_name = _extract_project_name_cached(root_path)
+    if debug:
+        logger.debug("Project name for %s: %s", root_path, project_name)
+    return project_name
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_project_name_cached(root_path: str) -> str:
+    """Memoized body of extract_project_name_from_path."""
     if not root_path or root_path == '/':
         return "Root"
         
     path_parts = [p for p in root_path.split('/') if p]
     
+    # Fast path: /Users/<name>/.../<known project>
+    if (len(path_parts) >= 3 and path_parts[0] in _HOME_DIR_PATTERNS
+            and path_parts[-1] in _KNOWN_PROJECTS and path_parts[-1] != _CURRENT_USERNAME):
+        return path_parts[-1]
+    
+    # First index of each component, for O(1) lookups below
+    first_index: Dict[str, int] = {}
+    for i, part in enumerate(path_parts):
+        first_index.setdefault(part, i)
+    
     # Skip common user directory patterns
     project_name = None
-    home_dir_patterns = ['Users', 'home']
-    
-    # Get current username for comparison
-    current_username = os.path.basename(os.path.expanduser('~'))
     
     # Find user directory in path
     username_index = -1
     for i, part in enumerate(path_parts):
-        if part in home_dir_patterns:
+        if part in _HOME_DIR_PATTERNS:
             username_index = i + 1
             break
     
     # If this is just /Users/username with no deeper path, don't use username as project
-    if username_index >= 0 and username_index < len(path_parts) and path_parts[username_index] == current_username:
+    if username_index >= 0 and username_index < len(path_parts) and path_parts[username_index] == _CURRENT_USERNAME:
         if len(path_parts) <= username_index + 1:
             return "Home Directory"
     
     if username_index >= 0 and username_index + 1 < len(path_parts):
-        # First try specific project directories we know about by name
-        known_projects = ['genaisf', 'cursor-view', 'cursor', 'cursor-apps', 'universal-github', 'inquiry']
-        
-        # Look at the most specific/deepest part of the path first
+        # First try specific project directories we know about by name,
+        # looking at the most specific/deepest part of the path first
         for i in range(len(path_parts)-1, username_index, -1):
-            if path_parts[i] in known_projects:
+            if path_parts[i] in _KNOWN_PROJECTS:
                 project_name = path_parts[i]
                 break
         
         # If no known project found, use the last part of the path as it's likely the project directory
         if not project_name and len(path_parts) > username_index + 1:
             # Check if we have a structure like /Users/username/Documents/codebase/project_name
-            if 'Documents' in path_parts and 'codebase' in path_parts:
-                doc_index = path_parts.index('Documents')
-                codebase_index = path_parts.index('codebase')
+            if 'Documents' in first_index and 'codebase' in first_index:
+                codebase_index = first_index['codebase']
                 
                 # If there's a path component after 'codebase', use that as the project name
                 if codebase_index + 1 < len(path_parts):
@@ -111,23 +138,21 @@ def extract_project_name_from_path(root_path: str, debug: bool = False) -> str:
                 project_name = path_parts[-1]
         
         # Skip username as project name
-        if project_name == current_username:
+        if project_name == _CURRENT_USERNAME:
             project_name = 'Home Directory'
         
         # Skip common project container directories
-        project_containers = ['Documents', 'Projects', 'Code', 'workspace', 'repos', 'git', 'src', 'codebase']
-        if project_name in project_containers:
+        if project_name in _PROJECT_CONTAINERS:
             # Don't use container directories as project names
             # Try to use the next component if available
-            container_index = path_parts.index(project_name)
+            container_index = first_index[project_name]
             if container_index + 1 < len(path_parts):
                 project_name = path_parts[container_index + 1]
         
         # If we still don't have a project name, use the first non-system directory after username
         if not project_name and username_index + 1 < len(path_parts):
-            system_dirs = ['Library', 'Applications', 'System', 'var', 'opt', 'tmp']
             for i in range(username_index + 1, len(path_parts)):
-                if path_parts[i] not in system_dirs and path_parts[i] not in project_containers:
+                if path_parts[i] not in _SYSTEM_DIRS and path_parts[i] not in _PROJECT_CONTAINERS:
                     project_name = path_parts[i]
                     break
     else:
@@ -135,7 +160,7 @@ def extract_project_name_from_path(root_path: str, debug: bool = False) -> str:
         project_name = path_parts[-1] if path_parts else "Root"
     
     # Final check: don't return username as project name
-    if project_name == current_username:
+    if project_name == _CURRENT_USERNAME:
         project_name = "Home Directory"
     
-    return project_name if project_name else "Unknown Project" 
\ No newline at end of file
+    return project_name if project_name else "Unknown Project"
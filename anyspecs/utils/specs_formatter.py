@@ -45,16 +45,14 @@ class SpecsFormatter:
         """Extract meaningful project name from filename or parsed data."""
         
         # Use parsed project name if available and meaningful
-        if (parsed_project_name and 
-            parsed_project_name.strip() and 
-            parsed_project_name != "未知项目" and
-            parsed_project_name != "Unknown Project"):
-            return parsed_project_name.strip()
+        if parsed_project_name and parsed_project_name not in ("未知项目", "Unknown Project"):
+            stripped_name = parsed_project_name.strip()
+            if stripped_name:
+                return stripped_name
         
         # Extract from original filename
-        if original_filename and original_filename.strip():
-            safe_original_name = original_filename.strip()
-            
+        safe_original_name = original_filename.strip() if original_filename else ''
+        if safe_original_name:
             # Remove file extension
             extracted = re.sub(r'\.[^/.]+$', '', safe_original_name)
             
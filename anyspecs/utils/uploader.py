@@ -8,6 +8,12 @@ import requests
 from pathlib import Path
 from typing import Optional
 
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+
 
 class AnySpecsUploadClient:
     """AnySpecs file upload client"""
@@ -129,9 +135,21 @@ class AnySpecsUploadClient:
         print(f"   Description: {description or 'No description'}")
 
         try:
-            files = {"file": (p.name, open(p, "rb"), "application/octet-stream")}
-            data = {"description": description} if description else {}
-            resp = self.session.post(f"{self.base_url}/api/file/", files=files, data=data)
+            with open(p, "rb") as f:
+                if TOOLBELT_AVAILABLE:
+                    # Stream the multipart body instead of building it in memory
+                    fields = {"description": description} if description else {}
+                    fields["file"] = (p.name, f, "application/octet-stream")
+                    encoder = MultipartEncoder(fields=fields)
+                    resp = self.session.post(
+                        f"{self.base_url}/api/file/",
+                        data=encoder,
+                        headers={"Content-Type": encoder.content_type},
+                    )
+                else:
+                    files = {"file": (p.name, f, "application/octet-stream")}
+                    data = {"description": description} if description else {}
+                    resp = self.session.post(f"{self.base_url}/api/file/", files=files, data=data)
             if resp.status_code == 200:
                 result = resp.json()
                 if result.get("success"):